@@ -7,10 +7,10 @@ import os
 import sys
 import traceback
 from secrets import token_hex
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, cast
 
 import boto3
-from boto3.resources.base import ServiceResource
+from botocore.client import BaseClient
 from botocore.exceptions import ClientError
 from stac_fastapi.opensearch.database_logic import DatabaseLogic
 from stac_fastapi.types.errors import NotFoundError
@@ -24,7 +24,7 @@ from aws.osml.data_intake.utils import AsyncContextFilter, BotoConfig, ServiceCo
 class BulkProcessor:
     def __init__(
         self,
-        aws_s3: ServiceResource,
+        aws_s3: BaseClient,
         output_path: str,
         output_bucket: str,
         stac_endpoint: str,
@@ -116,7 +116,12 @@ class BulkProcessor:
         async with semaphore:
             try:
                 image_id = token_hex(16)
-                image_data, s3_manager = self.generate_upload_files(image, image_id)
+                # asyncio.to_thread runs on a copy of this task's context, so set the item id here to tag the logs
+                #  of this task as well as the logs of the thread
+                AsyncContextFilter.set_context({"item_id": image_id})
+                # The downloads, GDAL processing and uploads block, so run them on a thread to let the other workers
+                #  process their images at the same time
+                image_data, s3_manager = await asyncio.to_thread(self.generate_upload_files, image, image_id)
                 logger.info(f"Creating STAC item with ID {image_id}")
                 stac_item = image_data.generate_stac_item(s3_manager, image_id, self.collection_id, self.stac_endpoint)
                 return stac_item
@@ -145,7 +150,7 @@ class BulkProcessor:
             raise Exception(f"Unable to submit data catalog item... {error}")
 
     async def create_minimal_collection(self, collection_id: str) -> None:
-        collection = Collection(**get_minimal_collection_dict(collection_id))
+        collection = cast(Collection, get_minimal_collection_dict(collection_id))
         await self.database.create_collection(collection)
 
 
@@ -203,7 +208,7 @@ async def start_workers(image_batch: List[str], bulk_processor: BulkProcessor, m
     logger.info("All images processed.")
 
 
-def process_manifest_file(aws_s3: ServiceResource, input_path: str, s3_uri: str) -> Optional[List[str]]:
+def process_manifest_file(aws_s3: BaseClient, input_path: str, s3_uri: str) -> Optional[List[str]]:
     """
     Processes a manifest file containing a list of S3 object paths.
 
@@ -215,7 +220,7 @@ def process_manifest_file(aws_s3: ServiceResource, input_path: str, s3_uri: str)
     """
     s3_url = S3Url(s3_uri)
     local_json_path = f"{input_path}/{s3_url.key}"
-    aws_s3.meta.client.download_file(s3_url.bucket, s3_url.key, local_json_path)
+    aws_s3.download_file(s3_url.bucket, s3_url.key, local_json_path)
 
     with open(local_json_path, "r", encoding="utf-8") as manifest_file:
         manifest_data = json.load(manifest_file)
@@ -235,7 +240,7 @@ def process_manifest_file(aws_s3: ServiceResource, input_path: str, s3_uri: str)
 async def main() -> None:
     """
     This function is responsible for orchestrating the data intake process. It retrieves the necessary
-    environment variables, initializes the AWS S3 resource, processes the manifest file, generate
+    environment variables, initializes the AWS S3 client, processes the manifest file, generate
     ovr/aux, create STAC item, and publish to the Database Cluster
 
     :returns: None
@@ -245,7 +250,7 @@ async def main() -> None:
         logger.setLevel(logging.DEBUG)
 
     try:
-        aws_s3 = boto3.resource("s3", config=BotoConfig.default)
+        aws_s3 = boto3.client("s3", config=BotoConfig.default)
     except ClientError as err:
         sys.exit(f"Fatal error occurred while initializing AWS services. Exiting. {err}")
 
@@ -5,7 +5,7 @@ import os
 import time
 from datetime import datetime, timezone
 from math import ceil, degrees, log
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, cast
 
 from osgeo import gdal
 from stac_fastapi.types.stac import Item
@@ -14,7 +14,7 @@ from aws.osml.gdal.gdal_utils import load_gdal_dataset
 from aws.osml.photogrammetry.coordinates import ImageCoordinate
 from aws.osml.photogrammetry.sensor_model import SensorModel
 
-from .managers import S3Manager, S3Url, SNSManager, SNSRequest
+from .managers import S3Manager, S3Url, SNSManager, SNSRequest, encode_message
 from .processor_base import ProcessorBase
 from .utils import AsyncContextFilter, logger
 
@@ -22,6 +22,16 @@ os.environ["PROJ_LIB"] = "/opt/conda/envs/osml_data_intake/share/proj"
 
 gdal.UseExceptions()
 
+_UTC = timezone.utc
+
+# The parts of each STAC asset that never change between images, only the hrefs are filled in per item. Roles are
+#  tuples so the shared templates cannot be modified through an item.
+_DATA_ASSET = {"title": "Source Image", "type": "image/tiff", "roles": ("data",)}
+_AUX_ASSET = {"title": "Processed Auxiliary", "type": "application/xml", "roles": ("data",)}
+_INFO_ASSET = {"title": "GDAL Info", "type": "application/json", "roles": ("data",)}
+_OVERVIEW_ASSET = {"title": "Image Overview", "type": "application/geotiff", "roles": ("overview",)}
+_OVR_ASSET = {"title": "Processed Overview", "type": "application/octet-stream", "roles": ("data",)}
+
 
 class ImageData:
     def __init__(self, source_file: str) -> None:
@@ -192,61 +202,43 @@ class ImageData:
         :raises ClientError: If publishing to SNS fails.
         """
         logger.info("Creating STAC item.")
-        key = s3_manager.s3_url.key
+        # Build the source and output locations once, every asset href is derived from them
+        item_id = request.item_id
+        source_uri = f"s3://{s3_manager.s3_url.bucket}/{s3_manager.s3_url.key}"
+        output_uri = f"s3://{s3_manager.output_bucket}/{item_id}/{s3_manager.s3_url.key}"
         assets = {
-            "data": {
-                "href": f"s3://{s3_manager.s3_url.bucket}/{key}",
-                "title": "Source Image",
-                "type": "image/tiff",
-                "roles": ["data"],
-            },
-            "aux": {
-                "href": f"s3://{s3_manager.output_bucket}/{request.item_id}/{key}{self.aux_ext}",
-                "title": "Processed Auxiliary",
-                "type": "application/xml",
-                "roles": ["data"],
-            },
-            "info": {
-                "href": f"s3://{s3_manager.output_bucket}/{request.item_id}/{key}{self.gdalinfo_ext}",
-                "title": "GDAL Info",
-                "type": "application/json",
-                "roles": ["data"],
-            },
+            "data": {"href": source_uri, **_DATA_ASSET},
+            "aux": {"href": f"{output_uri}{self.aux_ext}", **_AUX_ASSET},
+            "info": {"href": f"{output_uri}{self.gdalinfo_ext}", **_INFO_ASSET},
         }
         if request.tile_server_url:
             assets["overview"] = {
                 "href": request.tile_server_url,
-                "title": "Image Overview",
-                "type": "application/geotiff",
-                "roles": ["overview"],
-                "item_id": request.item_id,
+                **_OVERVIEW_ASSET,
+                "item_id": item_id,
                 "collection_id": request.collection_id,
-                "s3_uri": f"s3://{s3_manager.s3_url.bucket}/{key}",
+                "s3_uri": source_uri,
                 "tile_size": self.viewpoint_tile_size,
                 "range_adjustment": self.viewpoint_range_adjustment,
             }
         if ovr_file:
-            assets["ovr"] = {
-                "href": f"s3://{s3_manager.output_bucket}/{request.item_id}/{key}{self.overview_ext}",
-                "title": "Processed Overview",
-                "type": "application/octet-stream",
-                "roles": ["data"],
-            }
-        return Item(
-            **{
-                "id": request.item_id,
+            assets["ovr"] = {"href": f"{output_uri}{self.overview_ext}", **_OVR_ASSET}
+        return cast(
+            Item,
+            {
+                "id": item_id,
                 "collection": request.collection_id,
                 "type": "Feature",
                 "geometry": {"type": "Polygon", "coordinates": self.geo_polygon},
                 "bbox": self.geo_bbox,
                 "properties": {
-                    "datetime": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+                    "datetime": datetime.now(_UTC).isoformat().replace("+00:00", "Z"),
                     "description": f"STAC Item for image {s3_manager.s3_url.url}",
                 },
                 "assets": assets,
                 "links": [{"href": stac_catalog, "rel": "self"}],
                 "stac_version": "1.0.0",
-            }
+            },
         )
 
     def clean_dataset(self) -> None:
@@ -315,14 +307,18 @@ class ImageProcessor(ProcessorBase):
             self.s3_manager.set_output_folder(self.sns_request.item_id)
 
             # upload info, aux, ovr files file
-            self.s3_manager.upload_file(info_file, "GDAL INFO", {"ContentType": "application/json"})
-            self.s3_manager.upload_file(aux_file, "AUX", {"ContentType": "application/xml"})
+            upload_files = [
+                (info_file, "GDAL INFO", {"ContentType": "application/json"}),
+                (aux_file, "AUX", {"ContentType": "application/xml"}),
+            ]
             if ovr_file:
-                self.s3_manager.upload_file(ovr_file, "OVR", {"ContentType": "image/tiff"})
+                upload_files.append((ovr_file, "OVR", {"ContentType": "image/tiff"}))
+            self.s3_manager.upload_files(upload_files)
 
             # Generate and publish the STAC item to the SNS topic
             stac_item = image_data.generate_stac_item(self.s3_manager, self.sns_request, ovr_file)
-            self.sns_manager.publish_message(json.dumps(stac_item))
+            message, attributes = encode_message(stac_item)
+            self.sns_manager.publish_message(message, attributes=attributes)
 
             # Clean up the GDAL dataset
             image_data.clean_dataset()
@@ -1,16 +1,52 @@
 # Copyright 2024 Amazon.com, Inc. or its affiliates.
 
 import asyncio
+import base64
 import json
-from typing import Any, Dict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple, cast
 
-from stac_fastapi.opensearch.database_logic import DatabaseLogic
+import boto3
+import orjson
+from opensearchpy import AsyncHttpConnection, AsyncOpenSearch, AWSV4SignerAsyncAuth, helpers
+from stac_fastapi.opensearch import config as opensearch_config
+from stac_fastapi.opensearch.database_logic import DatabaseLogic, mk_actions, mk_item_id
 from stac_fastapi.types.errors import NotFoundError
 from stac_fastapi.types.stac import Collection, Item
 
-from .managers import SNSManager
+from .managers import MESSAGE_FORMAT_ATTRIBUTE, MSGPACK_MESSAGE_FORMAT, SNSManager, decode_message
 from .processor_base import ProcessorBase
-from .utils import AsyncContextFilter, ServiceConfig, get_minimal_collection_dict, logger
+from .utils import ServiceConfig, get_minimal_collection_dict, logger, logger_adapter_for
+
+
+def search_client_config() -> Dict[str, Any]:
+    """
+    Read the OpenSearch connection settings (hosts, SSL and authentication) from the stac_fastapi ES_* environment
+    variables. stac_fastapi only exposes this through a private helper, so keep the dependency on it in one place.
+
+    :returns: The keyword arguments of the OpenSearch client.
+    """
+    return opensearch_config._es_config()
+
+
+def create_search_client() -> AsyncOpenSearch:
+    """
+    Build an async OpenSearch client from the stac_fastapi ES_* environment settings, with a connection pool sized
+    for concurrent requests and, when enabled, SigV4 request signing.
+
+    :returns: The async OpenSearch client.
+    """
+    config = search_client_config()
+    if ServiceConfig.opensearch_sigv4:
+        credentials = boto3.Session().get_credentials()
+        config["http_auth"] = AWSV4SignerAsyncAuth(credentials, ServiceConfig.aws_region, "es")
+    return AsyncOpenSearch(
+        **config, connection_class=AsyncHttpConnection, maxsize=ServiceConfig.opensearch_max_connections, timeout=30
+    )
+
+
+# Share one client, its connection pool and its signer across every invocation of this container
+_SEARCH_CLIENT = create_search_client()
 
 
 class IngestProcessor(ProcessorBase):
@@ -19,16 +55,21 @@ class IngestProcessor(ProcessorBase):
     database logic from stac_fastapi.opensearch.database_logic.
     """
 
-    def __init__(self, message: str):
+    def __init__(self, message: str, message_format: Optional[str] = None):
         """
         Initialize the STACProcessor with an OpenSearch DatabaseLogic client.
 
         :param message: The incoming SNS request message.
+        :param message_format: The format message attribute of the SNS message, if present.
         """
         self.database = DatabaseLogic()
-        self.stac_item = Item(**json.loads(message))
+        self.database.client = _SEARCH_CLIENT
+        self.stac_item = cast(Item, decode_message(message, message_format))
+        self.log = logger_adapter_for({"item_id": self.stac_item.get("id")})
         self.sns_manager = (
-            SNSManager(ServiceConfig.stac_post_processing_topic) if ServiceConfig.stac_post_processing_topic else None
+            SNSManager(ServiceConfig.stac_post_processing_topic, self.log)
+            if ServiceConfig.stac_post_processing_topic
+            else None
         )
 
     async def process(self) -> Dict[str, Any]:
@@ -39,48 +80,223 @@ class IngestProcessor(ProcessorBase):
         :raises Exception: Raised if there is an error during item ingestion.
         """
         try:
-            # Here we assume 'item' includes necessary fields like 'id'
-            item_id = self.stac_item["id"]
-            AsyncContextFilter.set_context({"item_id": item_id})
-            collection_id = self.stac_item["collection"]
-            logger.info(f"Creating STAC item in collection {collection_id}.")
-
             # Create a STAC item in the open search database.
-            #  If the item collection does not exist, create a minimal one and then insert the item.
-            try:
-                await self.database.check_collection_exists(collection_id)
-            except NotFoundError:
-                logger.info(f"{collection_id} collection not found. Creating minimal collection.")
-                await self.create_minimal_collection(collection_id)
-            prepped_item = await self.database.prep_create_item(self.stac_item, "")
-            logger.info(f"Prepped data: {prepped_item}")
+            prepped_item = await self.prep_item()
+            self.log.info("Prepped data: %s", prepped_item)
             await self.database.create_item(prepped_item)
 
-            # Add STAC items with asset title that matches one in POST_PROCESS_ASSET_DATA_TITLES
-            #  to the post-processing topic, if present
-            asset_data_title = self.stac_item.get("assets", {}).get("data", {}).get("title", None)
-            if self.sns_manager and asset_data_title and asset_data_title in ServiceConfig.post_processing_asset_data_titles:
-                self.sns_manager.publish_message(message=json.dumps(self.stac_item), subject=asset_data_title)
+            # Publish the item for post-processing, if configured
+            published = self.publish_post_processing(prepped_item)
+            if published:
+                published.result()
 
             # Return a success message
-            return self.success_message("STAC item created successfully")
+            return self.success_message("STAC item created successfully", self.log)
         except Exception as error:
             # Return a failure message with the stack trace
-            return self.failure_message(error)
+            return self.failure_message(error, self.log)
+
+    @classmethod
+    async def process_batch(
+        cls, messages: Dict[str, str], message_formats: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Process a batch of STAC item messages, inserting all prepped items with a single bulk request.
+
+        :param messages: The incoming SNS messages keyed by the ID of the record that delivered them.
+        :param message_formats: The format message attributes of the messages that have one, keyed by record ID.
+        :returns: A Lambda partial batch response listing the records that failed and should be retried.
+        """
+        message_formats = message_formats or {}
+        failures: List[str] = []
+        # Records carrying the same item share a single bulk action, the last record delivered wins like it would if
+        #  the items were indexed one after the other
+        record_ids: Dict[str, List[str]] = {}
+        prepped: Dict[str, Tuple[IngestProcessor, Item]] = {}
+        for record_id, message in messages.items():
+            try:
+                processor = cls(message, message_formats.get(record_id))
+            except Exception as error:
+                logger.error(f"Unable to read STAC item from record {record_id}: {error}")
+                failures.append(record_id)
+                continue
+            try:
+                # Redelivered records may have been inserted already, the bulk index action simply replaces them
+                item = await processor.prep_item(exist_ok=True)
+            except Exception as error:
+                processor.log.error(f"Unable to prepare STAC item from record {record_id}: {error}")
+                failures.append(record_id)
+                continue
+            item_id = mk_item_id(item["id"], item["collection"])
+            record_ids.setdefault(item_id, []).append(record_id)
+            prepped[item_id] = (processor, item)
+
+        if prepped:
+            # Insert every prepped item with one bulk request and map any per-document errors back to their records
+            actions = [action for _, item in prepped.values() for action in mk_actions(item["collection"], [item])]
+            try:
+                _, errors = await helpers.async_bulk(_SEARCH_CLIENT, actions, raise_on_error=False)
+                failed_ids = {next(iter(error.values()))["_id"] for error in errors}
+            except Exception as error:
+                logger.error(f"Unable to bulk insert {len(actions)} STAC item(s): {error}")
+                failed_ids = set(prepped)
+
+            # Group the inserted items by the subject they are sent for post-processing with
+            post_processing: Dict[str, List[Tuple[IngestProcessor, Item]]] = {}
+            for item_id, (processor, item) in prepped.items():
+                if item_id in failed_ids:
+                    processor.log.error(f"Unable to insert STAC item from record(s) {', '.join(record_ids[item_id])}.")
+                    failures.extend(record_ids[item_id])
+                    continue
+                subject = processor.post_processing_subject(item)
+                if subject:
+                    post_processing.setdefault(subject, []).append((processor, item))
+            if post_processing:
+                cls.publish_post_processing_batch(post_processing)
+
+        logger.info(f"Ingested {len(messages) - len(failures)} of {len(messages)} STAC item(s).")
+        return {"batchItemFailures": [{"itemIdentifier": record_id} for record_id in failures]}
+
+    async def prep_item(self, exist_ok: bool = False) -> Item:
+        """
+        Prepare the STAC item for insertion, first creating a minimal collection for it if its collection does not
+        exist yet.
+
+        :param exist_ok: Whether the item may already exist in the database.
+        :returns: The database ready STAC item.
+        """
+        collection_id = self.stac_item["collection"]
+        self.log.info(f"Creating STAC item in collection {collection_id}.")
+
+        # If the item collection does not exist, create a minimal one and then prep the item.
+        try:
+            await self.database.check_collection_exists(collection_id)
+        except NotFoundError:
+            self.log.info(f"{collection_id} collection not found. Creating minimal collection.")
+            await self.create_minimal_collection(collection_id)
+
+        return await self.database.prep_create_item(self.stac_item, "", exist_ok=exist_ok)
+
+    def post_processing_subject(self, item: Item) -> Optional[str]:
+        """
+        Get the subject a STAC item is sent to the post-processing topic with, if it is sent at all. Items are sent
+        when the topic is configured and the title of their data asset is one of POST_PROCESS_ASSET_DATA_TITLES.
+
+        :param item: The database ready STAC item, as returned by `prep_item`.
+        :returns: The title of the data asset of the item, or None if the item is not sent for post-processing.
+        """
+        try:
+            asset_data_title = item["assets"]["data"]["title"]
+        except KeyError:
+            return None
+        if self.sns_manager and asset_data_title in ServiceConfig.post_processing_asset_data_titles:
+            return asset_data_title
+        return None
+
+    def publish_post_processing(self, item: Item) -> Optional[Future]:
+        """
+        Add STAC items with asset title that matches one in POST_PROCESS_ASSET_DATA_TITLES to the post-processing
+        topic, if present. The message is published in the background.
+
+        :param item: The database ready STAC item, as returned by `prep_item`.
+        :returns: A future for the published message, or None if the item is not sent for post-processing.
+        """
+        subject = self.post_processing_subject(item)
+        if subject:
+            # Post-processing subscribers are sent JSON regardless of the format the item arrived in
+            return self.sns_manager.publish_message_async(message=orjson.dumps(item).decode("utf-8"), subject=subject)
+        return None
+
+    @staticmethod
+    def publish_post_processing_batch(items: Dict[str, List[Tuple["IngestProcessor", Item]]]) -> None:
+        """
+        Publish STAC items to the post-processing topic with PublishBatch requests. The items are stored at this
+        point, so failures are logged rather than sending their records back for a retry.
+
+        :param items: The items to publish and the processors that prepped them, keyed by the subject to publish with.
+        """
+        sns_manager = SNSManager(ServiceConfig.stac_post_processing_topic)
+        for subject, entries in items.items():
+            messages = [orjson.dumps(item).decode("utf-8") for _, item in entries]
+            try:
+                failed = sns_manager.publish_messages(messages, subject)
+            except Exception as error:
+                failed = [{"Id": str(index), "Message": str(error)} for index in range(len(entries))]
+            for entry in failed:
+                processor = entries[int(entry["Id"])][0]
+                processor.log.error(f"Unable to publish STAC item for post-processing: {entry.get('Message', '')}")
 
     async def create_minimal_collection(self, collection_id: str) -> None:
-        collection = Collection(**get_minimal_collection_dict(collection_id))
-        await self.database.create_collection(collection)
+        """
+        Create a minimal STAC collection in the database.
+
+        :param collection_id: The ID of the collection to create.
+        """
+        await self.database.create_collection(cast(Collection, get_minimal_collection_dict(collection_id)))
+
+
+def unwrap_sqs_record(record: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """
+    Extract the SNS message and its format message attribute from an SQS record. SNS subscriptions without raw
+    message delivery wrap the message and its attributes in a notification envelope, while raw delivery carries the
+    attributes on the SQS record itself.
+
+    :param record: The SQS record.
+    :return: The SNS message carried by the record and its format, or None if it has no format attribute.
+    """
+    body = record["body"]
+    # Only JSON bodies can be notification envelopes, raw base64 encoded msgpack messages are passed through as is
+    if body.startswith("{"):
+        envelope = json.loads(body)
+        if envelope.get("Type") == "Notification":
+            attribute = envelope.get("MessageAttributes", {}).get(MESSAGE_FORMAT_ATTRIBUTE, {})
+            return envelope["Message"], attribute.get("Value")
+    attribute = record.get("messageAttributes", {}).get(MESSAGE_FORMAT_ATTRIBUTE, {})
+    return body, attribute.get("stringValue")
+
+
+def unwrap_kinesis_record(record: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """
+    Extract the STAC item message and its format from a Kinesis record. Kinesis records carry no attributes, so the
+    format is taken from the payload itself: JSON messages are passed on as text, anything else is taken to be a
+    msgpack message, which the base64 encoded record data already matches.
+
+    :param record: The Kinesis record.
+    :return: The STAC item message carried by the record and its format, or None for JSON messages.
+    """
+    data = record["kinesis"]["data"]
+    payload = base64.b64decode(data)
+    if payload.lstrip().startswith(b"{"):
+        return payload.decode("utf-8"), None
+    return data, MSGPACK_MESSAGE_FORMAT
 
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
-    The AWS Lambda handler function to process an event.
+    The AWS Lambda handler function to process an event. SNS events carry a single message, while SQS and Kinesis
+    events carry a batch of messages that are ingested together.
 
-    :param event: The event payload contains the SNS message.
+    :param event: The event payload contains the SNS message, or a batch of SQS records wrapping SNS messages or of
+        Kinesis records.
     :param context: The Lambda execution context (unused).
-    :return: The response from the IngestProcessor process.
+    :return: The response from the IngestProcessor process, or a partial batch response for SQS and Kinesis events.
     """
-    # Log the event payload to see the raw SNS message
-    message = event["Records"][0]["Sns"]["Message"]
-    return asyncio.get_event_loop().run_until_complete(IngestProcessor(message).process())
+    records = event["Records"]
+    if "Sns" in records[0]:
+        sns = records[0]["Sns"]
+        message_format = sns.get("MessageAttributes", {}).get(MESSAGE_FORMAT_ATTRIBUTE, {}).get("Value")
+        return asyncio.get_event_loop().run_until_complete(IngestProcessor(sns["Message"], message_format).process())
+
+    messages, message_formats = {}, {}
+    for record in records:
+        # Kinesis partial batch responses identify records by their sequence number
+        if "kinesis" in record:
+            record_id = record["kinesis"]["sequenceNumber"]
+            message, message_format = unwrap_kinesis_record(record)
+        else:
+            record_id = record["messageId"]
+            message, message_format = unwrap_sqs_record(record)
+        messages[record_id] = message
+        if message_format:
+            message_formats[record_id] = message_format
+    return asyncio.get_event_loop().run_until_complete(IngestProcessor.process_batch(messages, message_formats))
@@ -5,4 +5,12 @@
 # flake8: noqa
 
 from .s3_manager import S3Manager, S3Url
-from .sns_manager import SNSManager, SNSRequest
+from .sns_manager import (
+    MESSAGE_FORMAT_ATTRIBUTE,
+    MSGPACK_MESSAGE_FORMAT,
+    SNSManager,
+    SNSRequest,
+    decode_message,
+    encode_message,
+    get_sns_client,
+)
@@ -1,80 +1,54 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
+import contextvars
 import os
 import shutil
 import traceback
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlparse
 
 import boto3
-from boto3.resources.base import ServiceResource
+from boto3.exceptions import S3UploadFailedError
+from botocore.client import BaseClient
 from botocore.exceptions import ClientError
 
-from ..utils import logger
+from ..utils import BotoConfig, logger
 
+# The number of objects transferred at the same time by the bulk download and upload methods
+S3_TRANSFER_WORKERS = 16
 
+
+@dataclass(frozen=True, slots=True)
 class S3Url:
     """
-    A class to parse and represent an S3 URL.
+    A class to parse and represent an S3 URL. The URL is parsed once and its components are stored on the instance.
 
     :param url: The S3 URL to be parsed.
     """
 
-    def __init__(self, url: str) -> None:
-        """
-        Initialize an S3Url instance.
-
-        :param url: The S3 URL to be parsed.
-        """
-        self._parsed = urlparse(url, allow_fragments=False)
-
-    @property
-    def bucket(self) -> str:
-        """
-        Get the bucket name from the parsed URL.
-
-        :return: The bucket name.
-        """
-        return self._parsed.netloc
-
-    @property
-    def key(self) -> str:
-        """
-        Get the object key from the parsed URL.
-
-        :return: The object key.
-        """
-        if self._parsed.query:
-            return self._parsed.path.lstrip("/") + "?" + self._parsed.query
-        else:
-            return self._parsed.path.lstrip("/")
-
-    @property
-    def url(self) -> str:
-        """
-        Get the full URL as a string.
+    url: str
+    bucket: str = field(init=False)
+    key: str = field(init=False)
+    prefix: str = field(init=False)
+    filename: str = field(init=False)
 
-        :return: The full URL.
+    def __post_init__(self) -> None:
         """
-        return self._parsed.geturl()
+        Parse the S3 URL into its bucket, object key, prefix (directory path) and filename components.
 
-    @property
-    def prefix(self) -> str:
-        """
-        Get the prefix (directory path) from the S3 key, excluding the file name and extension.
-
-        :return: The prefix.
-        """
-        return os.path.dirname(self.key)
-
-    @property
-    def filename(self) -> str:
-        """
-        Get the filename with extension from the S3 key.
-
-        :return: The filename with extension.
+        :return: None
         """
-        return os.path.basename(self.key)
+        parsed = urlparse(self.url, allow_fragments=False)
+        key = parsed.path.lstrip("/")
+        if parsed.query:
+            key = f"{key}?{parsed.query}"
+        object.__setattr__(self, "url", parsed.geturl())
+        object.__setattr__(self, "bucket", parsed.netloc)
+        object.__setattr__(self, "key", key)
+        object.__setattr__(self, "prefix", os.path.dirname(key))
+        object.__setattr__(self, "filename", os.path.basename(key))
 
 
 class S3Manager:
@@ -85,14 +59,16 @@ class S3Manager:
     :returns: None
     """
 
-    def __init__(self, output_bucket: str, aws_s3: ServiceResource = None, input_dir: str = "/tmp/images") -> None:
+    def __init__(self, output_bucket: str, aws_s3: BaseClient = None, input_dir: str = "/tmp/images") -> None:
         """
         Initialize an S3Manager instance.
 
         :param output_bucket: The name of the S3 bucket used for uploads.
+        :param aws_s3: Optional S3 client to use; a default client is created when not provided.
+        :param input_dir: The local directory objects are downloaded to.
         """
         self.output_bucket = "s3://" + output_bucket if not output_bucket.startswith("s3://") else output_bucket
-        self.s3_client = aws_s3 if aws_s3 else boto3.resource("s3")
+        self.s3_client = aws_s3 if aws_s3 else boto3.client("s3", config=BotoConfig.default)
         self.tmp_dir = input_dir
         self.s3_url: Optional[S3Url] = None
         self.output_folder = None
@@ -116,14 +92,42 @@ class S3Manager:
 
         :raises Exception: If any other error occurs during the download process.
         """
-        # Clean up directory before we start processing
-        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        self.clean_tmp_dir()
+        self.s3_url = s3_url
+        return self._download(s3_url)
+
+    def download_files(self, s3_urls: List[S3Url]) -> List[Optional[str]]:
+        """
+        Download several objects from S3 to the local `/tmp` directory concurrently. The objects are stored by
+        filename, so their filenames must be unique.
+
+        :param s3_urls: The objects to download.
+
+        :return: The paths to the downloaded files, in the order of `s3_urls`, with None for objects that failed.
+        """
+        self.clean_tmp_dir()
+        with ThreadPoolExecutor(max_workers=S3_TRANSFER_WORKERS) as executor:
+            # Run each download on its own copy of the caller's context so the log context tags the download logs
+            futures = [executor.submit(contextvars.copy_context().run, self._download, s3_url) for s3_url in s3_urls]
+            return [future.result() for future in futures]
 
-        # Create a storage directory in /tmp to use
+    def clean_tmp_dir(self) -> None:
+        """
+        Empty the local download directory, creating it if needed.
+
+        :return: None
+        """
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
         os.makedirs(self.tmp_dir, exist_ok=True)
 
-        # Extract metadata
-        self.s3_url = s3_url
+    def _download(self, s3_url: S3Url) -> Optional[str]:
+        """
+        Download an object from S3 into the local download directory, logging any failure.
+
+        :param s3_url: An object representing the S3 bucket and key for the source data.
+
+        :return: the path to the downloaded file, or None if the download failed
+        """
         source_bucket: str = s3_url.bucket
         source_key: str = s3_url.key
         source_filename: str = s3_url.filename
@@ -133,7 +137,7 @@ class S3Manager:
         logger.info(f"Downloading {s3_url.url} to {file_path}")
         try:
             logger.info(f"Beginning download of {s3_url.url}")
-            self.s3_client.meta.client.download_file(source_bucket, source_key, file_path)
+            self.s3_client.download_file(source_bucket, source_key, file_path)
             logger.info(f"Successfully download to {file_path}.")
             return file_path
         except ClientError as err:
@@ -147,25 +151,53 @@ class S3Manager:
         except Exception as err:
             logger.error(f"S3 Download {err} / {traceback.format_exc()}")
 
-    def upload_file(self, file_path: str, file_type: str, upload_args=None) -> None:
+    def upload_file(
+        self, file_path: Union[str, BinaryIO], file_type: str, upload_args=None, file_name: Optional[str] = None
+    ) -> None:
         """
         Upload the specified file to the configured S3 bucket.
 
-        :param file_path: The path to the file on the local system.
+        :param file_path: The path to the file on the local system, or a binary file-like object to upload directly.
         :param file_type: The type of file being uploaded (for logging purposes).
         :param upload_args: Optional arguments for boto3 ExtraArgs
-        :raises ClientError: If uploading to S3 fails.
+        :param file_name: The name of the uploaded object, required for file-like objects. Defaults to the base name
+            of the file path.
+        :raises ValueError: If a file-like object is given without a file name.
+        :raises S3UploadFailedError: If uploading to S3 fails.
         """
         if upload_args is None:
             upload_args = {}
+        is_file_object = hasattr(file_path, "read")
+        if is_file_object and not file_name:
+            raise ValueError(f"A file name is required to upload a file-like {file_type} object")
+        file_name = file_name or self.strip(file_path)
+        key = f"{self.output_folder}/{file_name}" if self.output_folder else file_name
+        bucket = self.output_bucket.replace("s3://", "")
         try:
-            key = f"{self.output_folder}/{self.strip(file_path)}" if self.output_folder else self.strip(file_path)
-            self.s3_client.meta.client.upload_file(
-                file_path, self.output_bucket.replace("s3://", ""), key, ExtraArgs=upload_args
-            )
+            if is_file_object:
+                self.s3_client.upload_fileobj(file_path, bucket, key, ExtraArgs=upload_args)
+            else:
+                self.s3_client.upload_file(file_path, bucket, key, ExtraArgs=upload_args)
             logger.info(f"Uploaded {file_type} file to {self.output_bucket}/{key}")
-        except ClientError as err:
+        except (ClientError, S3UploadFailedError) as err:
             logger.error(f"Failed to upload {file_type} file: {err}")
+            # upload_file wraps client errors in S3UploadFailedError while upload_fileobj raises them as is
+            if isinstance(err, ClientError):
+                raise S3UploadFailedError(f"Failed to upload {bucket}/{key}: {err}") from err
+            raise
+
+    def upload_files(self, files: List[Tuple[str, str, Optional[Dict]]]) -> None:
+        """
+        Upload several files to the configured S3 bucket concurrently.
+
+        :param files: The file path, file type (for logging purposes) and optional boto3 ExtraArgs of each file.
+        :raises S3UploadFailedError: If uploading any of the files fails.
+        """
+        with ThreadPoolExecutor(max_workers=S3_TRANSFER_WORKERS) as executor:
+            # Run each upload on its own copy of the caller's context so the log context tags the upload logs
+            futures = [executor.submit(contextvars.copy_context().run, self.upload_file, *file) for file in files]
+            for future in futures:
+                future.result()
 
     @staticmethod
     def strip(file_path: str) -> str:
@@ -175,4 +207,4 @@ class S3Manager:
         :param file_path: The path of the file as a string.
         :returns: The base file name.
         """
-        return os.path.basename(file_path).split("/")[-1]
+        return os.path.basename(file_path)
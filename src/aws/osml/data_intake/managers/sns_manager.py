@@ -1,15 +1,79 @@
 #  Copyright 2023-2024 Amazon.com, Inc. or its affiliates.
 
+import base64
+import contextvars
+import json
+import logging
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
 
 import boto3
+import msgpack
+import orjson
+from botocore.client import BaseClient
 from botocore.exceptions import ClientError
 
-from ..utils import logger
+from ..utils import BotoConfig, ServiceConfig, logger
 
+# The maximum number of entries SNS accepts in a single PublishBatch request
+SNS_MAX_BATCH_SIZE = 10
 
-@dataclass
+# The number of messages published in the background at the same time
+SNS_PUBLISH_WORKERS = 8
+
+# The message attribute naming the encoding of a message, and its value for base64 encoded msgpack messages. Messages
+#  without the attribute are JSON.
+MESSAGE_FORMAT_ATTRIBUTE = "format"
+MSGPACK_MESSAGE_FORMAT = "msgpack-b64"
+
+# SNS clients shared by every manager in the process, keyed by region
+_SNS_CLIENTS: Dict[str, BaseClient] = {}
+
+
+def get_sns_client(region: Optional[str] = None) -> BaseClient:
+    """
+    Get the SNS client for a region, creating it on first use. Reusing one client lets every manager share its
+    connection pool instead of creating a client and opening new connections for each one.
+
+    :param region: The AWS region of the client, defaults to the region of the service.
+    :returns: The shared SNS client.
+    """
+    region = region or ServiceConfig.aws_region
+    if region not in _SNS_CLIENTS:
+        _SNS_CLIENTS[region] = boto3.client("sns", region_name=region, config=BotoConfig.default)
+    return _SNS_CLIENTS[region]
+
+
+def encode_message(payload: Dict[str, Any]) -> Tuple[str, Dict[str, Dict[str, str]]]:
+    """
+    Encode a message in the format configured by MSG_FORMAT. SNS messages must be text, so msgpack payloads are base64
+    encoded and tagged with a format message attribute that lets subscribers pick the matching decoder.
+
+    :param payload: The message to encode.
+    :returns: The encoded message and the SNS message attributes to publish it with.
+    """
+    if ServiceConfig.message_format == "msgpack":
+        message = base64.b64encode(msgpack.packb(payload)).decode("ascii")
+        return message, {MESSAGE_FORMAT_ATTRIBUTE: {"DataType": "String", "StringValue": MSGPACK_MESSAGE_FORMAT}}
+    return orjson.dumps(payload).decode("utf-8"), {}
+
+
+def decode_message(message: str, message_format: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Decode a message published with `encode_message`.
+
+    :param message: The encoded message.
+    :param message_format: The value of the format message attribute, if the message had one.
+    :returns: The decoded message.
+    """
+    if message_format == MSGPACK_MESSAGE_FORMAT:
+        return msgpack.unpackb(base64.b64decode(message))
+    return json.loads(message)
+
+
+@dataclass(slots=True)
 class SNSRequest:
     image_uri: str
     item_id: str
@@ -24,27 +88,111 @@ class SNSManager:
     :param output_topic: The ARN of the SNS topic where messages are published.
     """
 
-    def __init__(self, output_topic: str) -> None:
+    # Background publisher threads shared by every manager, created on first use
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    def __init__(self, output_topic: str, log: Optional[Union[logging.Logger, logging.LoggerAdapter]] = None) -> None:
         """
         Initialize a new SNSManager instance.
 
         :param output_topic: The ARN of the SNS topic where messages will be published.
+        :param log: The logger to write publishing messages to, e.g. an adapter tagging them with the item ID. Defaults
+            to the application logger.
         :returns: None
         """
-        self.sns_client = boto3.client("sns")
+        self.sns_client = get_sns_client()
         self.output_topic = output_topic
+        self.log = log or logger
+        self._pending: Deque[Future] = deque()
 
-    def publish_message(self, message: str, subject: str = "New STAC Item") -> None:
+    def publish_message(
+        self, message: str, subject: str = "New STAC Item", attributes: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> None:
         """
         Publish a message to the configured SNS topic.
 
         :param message: The STAC Item as a string to be published.
         :param subject: The subject of the message.
+        :param attributes: Optional SNS message attributes to publish with the message.
         :raises ClientError: If publishing to SNS fails.
         """
         try:
-            logger.info(f"Publishing STAC item: {message}")
-            self.sns_client.publish(TopicArn=self.output_topic, Message=message, Subject=subject)
+            self.log.info("Publishing STAC item: %s", message)
+            if attributes:
+                self.sns_client.publish(
+                    TopicArn=self.output_topic, Message=message, Subject=subject, MessageAttributes=attributes
+                )
+            else:
+                self.sns_client.publish(TopicArn=self.output_topic, Message=message, Subject=subject)
         except ClientError as err:
-            logger.error(f"Failed to publish message: {err}")
+            self.log.error(f"Failed to publish message: {err}")
             raise err
+
+    def publish_message_async(
+        self, message: str, subject: str = "New STAC Item", attributes: Optional[Dict[str, Dict[str, str]]] = None
+    ) -> Future:
+        """
+        Publish a message to the configured SNS topic from a background thread, so the caller does not wait on the
+        SNS round trip. Call `flush` before shutting down to make sure every pending message was delivered.
+
+        :param message: The STAC Item as a string to be published.
+        :param subject: The subject of the message.
+        :param attributes: Optional SNS message attributes to publish with the message.
+        :returns: A future that resolves once SNS has accepted the message, or holds the ClientError if it did not.
+        """
+        if SNSManager._executor is None:
+            SNSManager._executor = ThreadPoolExecutor(max_workers=SNS_PUBLISH_WORKERS)
+        # Run on a copy of the caller's context so the log context set for the caller also tags the publishing logs
+        future = SNSManager._executor.submit(
+            contextvars.copy_context().run, self.publish_message, message, subject, attributes
+        )
+        self._pending.append(future)
+        return future
+
+    def flush(self) -> List[BaseException]:
+        """
+        Wait for every message published with `publish_message_async` to complete. Failures have already been logged
+        by the publishing thread.
+
+        :returns: The errors raised by messages that could not be published.
+        """
+        pending = []
+        while self._pending:
+            pending.append(self._pending.popleft())
+        wait(pending)
+        return [future.exception() for future in pending if future.exception() is not None]
+
+    def publish_messages(
+        self,
+        messages: List[str],
+        subject: str = "New STAC Item",
+        attributes: Optional[List[Optional[Dict[str, Dict[str, str]]]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Publish messages to the configured SNS topic using PublishBatch requests of up to 10 messages each.
+
+        :param messages: The STAC Items as strings to be published.
+        :param subject: The subject of the messages.
+        :param attributes: Optional SNS message attributes of each message, in the order of `messages`, e.g. the
+            attributes returned by `encode_message`.
+        :returns: The entries SNS reported as failed, with 'Id' set to the index of the message in `messages`.
+        :raises ClientError: If publishing a batch to SNS fails.
+        """
+        failed = []
+        for start in range(0, len(messages), SNS_MAX_BATCH_SIZE):
+            entries = []
+            for index, message in enumerate(messages[start : start + SNS_MAX_BATCH_SIZE], start):
+                entry = {"Id": str(index), "Message": message, "Subject": subject}
+                if attributes and attributes[index]:
+                    entry["MessageAttributes"] = attributes[index]
+                entries.append(entry)
+            try:
+                self.log.info(f"Publishing batch of {len(entries)} STAC item(s)")
+                response = self.sns_client.publish_batch(TopicArn=self.output_topic, PublishBatchRequestEntries=entries)
+            except ClientError as err:
+                self.log.error(f"Failed to publish message batch: {err}")
+                raise err
+            for entry in response.get("Failed", []):
+                self.log.error(f"Failed to publish message {entry['Id']}: {entry.get('Code')} {entry.get('Message', '')}")
+                failed.append(entry)
+        return failed
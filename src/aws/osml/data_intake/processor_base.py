@@ -1,9 +1,10 @@
 #  Copyright 2024 Amazon.com, Inc. or its affiliates.
 
 import json
+import logging
 import traceback
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Union
 
 from .utils import logger
 
@@ -14,31 +15,50 @@ class ProcessorBase(ABC):
     """
 
     @staticmethod
-    def success_message(message: str) -> Dict[str, Any]:
+    def success_message(message: str, log: Optional[Union[logging.Logger, logging.LoggerAdapter]] = None) -> Dict[str, Any]:
         """
         Returns a success message in the form of a dictionary, intended for an HTTP response.
 
         :param message: The success message to send when complete.
+        :param log: The logger to write the message to, e.g. an adapter tagging it with the item ID. Defaults to the
+            application logger.
         :returns: A dictionary with 'statusCode' set to 200 and a 'body' containing a success message.
         """
-        logger.info(message)
+        (log or logger).info(message)
         return {"statusCode": 200, "body": json.dumps(message)}
 
     @staticmethod
-    def failure_message(e: Exception) -> Dict[str, Any]:
+    def failure_payload(e: Exception, log: Optional[Union[logging.Logger, logging.LoggerAdapter]] = None) -> Dict[str, Any]:
         """
-        Returns an error message in the form of a dictionary, including a stack trace, intended for an HTTP response.
+        Logs a failure and returns the structured error it reports. The full stack trace is only written to the log;
+        the payload carries the exception type and message.
 
         :param e: The exception that triggered the failure.
-        :returns: A dictionary with 'statusCode' set to 500 and a 'body' containing the error message and stack trace.
+        :param log: The logger to write the stack trace to, e.g. an adapter tagging it with the item ID. Defaults to
+            the application logger.
+        :returns: A dictionary with the error 'message' and 'type'.
         """
-        # Log the error and stack trace
-        stack_trace = traceback.format_exc()
-        logger.error(f"Error creating STAC items: {e}\nStack trace: {stack_trace}")
+        # Log the error and stack trace, an exception that was never raised has no frames to format
+        if e.__traceback__ is None:
+            stack_trace = "".join(traceback.format_exception_only(type(e), e))
+        else:
+            stack_trace = "".join(traceback.TracebackException.from_exception(e).format())
+        (log or logger).error(f"Error creating STAC items: {e}\nStack trace: {stack_trace}")
 
-        # Return the error message and stack trace in the response
-        error_response = {"message": str(e), "stack_trace": stack_trace.splitlines()}
-        return {"statusCode": 500, "body": json.dumps(error_response)}
+        return {"message": str(e), "type": type(e).__name__}
+
+    @classmethod
+    def failure_message(
+        cls, e: Exception, log: Optional[Union[logging.Logger, logging.LoggerAdapter]] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns an error message in the form of a dictionary, intended for an HTTP response.
+
+        :param e: The exception that triggered the failure.
+        :param log: The logger to write the stack trace to. Defaults to the application logger.
+        :returns: A dictionary with 'statusCode' set to 500 and a 'body' containing the JSON encoded failure payload.
+        """
+        return {"statusCode": 500, "body": json.dumps(cls.failure_payload(e, log))}
 
     @abstractmethod
     def process(self) -> Dict[str, Any]:
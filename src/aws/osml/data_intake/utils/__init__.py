@@ -4,4 +4,4 @@
 # __init__.py file.
 # flake8: noqa
 from .app_config import BotoConfig, ServiceConfig, get_minimal_collection_dict
-from .logger import AsyncContextFilter, configure_logger, logger
+from .logger import AsyncContextFilter, OrjsonFormatter, configure_logger, logger, logger_adapter_for
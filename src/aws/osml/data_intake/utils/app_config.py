@@ -1,10 +1,10 @@
 #  Copyright 2024 Amazon.com, Inc. or its affiliates.
 
-import json
 import os
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Dict
 
+import orjson
 from botocore.config import Config
 
 
@@ -20,23 +20,27 @@ class ServiceConfig:
     aws_region:  (str) The AWS region where the Bulk Ingest is deployed.
     sts_arn: (str) The ARN of the STS role to assume for running the Bulk Ingest.
     max_conn_pool: (int) The maximum number of connections to maintain in the connection pool.
+    opensearch_max_connections: (int) The connection pool size of the shared async OpenSearch client.
+    opensearch_sigv4: (bool) Whether to sign OpenSearch requests with the AWS SigV4 credentials of the service.
+    message_format: (str) The encoding of published STAC items, "json" or "msgpack" (base64 encoded msgpack).
     """
 
     aws_region: str = os.getenv("AWS_DEFAULT_REGION", "us-west-2")
     sts_arn: str = os.getenv("STS_ARN", None)
-    max_conn_pool: str = os.getenv("NUMBER_OF_CONN_POOL", 500)
+    max_conn_pool: int = int(os.getenv("NUMBER_OF_CONN_POOL", 500))
     bulk_s3_uri = os.getenv("S3_URI")
     bulk_input_path = os.getenv("S3_INPUT_PATH")
     bulk_output_path = os.getenv("S3_OUTPUT_PATH")
     bulk_output_bucket = os.getenv("S3_OUTPUT_BUCKET")
     bulk_stac_endpoint = os.getenv("STAC_ENDPOINT")
     bulk_collection_id = os.getenv("COLLECTION_ID")
-    bulk_max_workers = int(os.getenv("THREAD_WORKERS", 1))
+    bulk_max_workers: int = int(os.getenv("THREAD_WORKERS", 1))
     bulk_enable_debugging = os.getenv("ENABLE_DEBUGGING")
     stac_post_processing_topic: str = os.getenv("STAC_POST_PROCESSING_TOPIC_ARN", None)
-    post_processing_asset_data_titles: list = field(
-        default_factory=lambda: json.loads(os.getenv("POST_PROCESS_ASSET_DATA_TITLES", "[]"))
-    )
+    opensearch_max_connections: int = int(os.getenv("ES_MAX_CONNECTIONS", 32))
+    opensearch_sigv4: bool = os.getenv("ES_USE_SIGV4", "false").lower() == "true"
+    message_format: str = os.getenv("MSG_FORMAT", "json").lower()
+    post_processing_asset_data_titles: frozenset = frozenset(orjson.loads(os.getenv("POST_PROCESS_ASSET_DATA_TITLES", "[]")))
 
 
 @dataclass
@@ -52,7 +56,7 @@ class BotoConfig:
     default: Config = Config(
         region_name=ServiceConfig.aws_region,
         retries={"max_attempts": 15, "mode": "standard"},
-        max_pool_connections=int(ServiceConfig.max_conn_pool),
+        max_pool_connections=ServiceConfig.max_conn_pool,
     )
 
 
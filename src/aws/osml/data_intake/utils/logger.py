@@ -2,8 +2,11 @@
 
 import contextvars
 import logging
-from typing import List, Optional
+import traceback
+from types import TracebackType
+from typing import Any, Dict, List, Optional
 
+import orjson
 from pythonjsonlogger.jsonlogger import JsonFormatter
 
 _LOG_CONTEXT = contextvars.ContextVar("_LOG_CONTEXT", default={})
@@ -12,12 +15,30 @@ _LOG_CONTEXT = contextvars.ContextVar("_LOG_CONTEXT", default={})
 class AsyncContextFilter(logging.Filter):
     """
     This is a filter that injects contextual information into the log message. The contextual information is
-    set using the static methods of this class.
+    set using the static methods of this class. Attributes already present on the record, e.g. supplied through
+    a LoggerAdapter created by `logger_adapter_for`, are left untouched.
     """
 
     def __init__(self, attribute_names: List[str]) -> None:
         super().__init__()
-        self.attribute_names = attribute_names
+        # Keep an immutable copy of the names so the caller's list can't change what the filter injects
+        self.attribute_names = tuple(attribute_names)
+        # Filters usually inject a single attribute, so skip the loop over attribute names for them
+        if len(attribute_names) == 1:
+            self._attribute_name = self.attribute_names[0]
+            self.filter = self._filter_attribute
+
+    def _filter_attribute(self, record: logging.LogRecord) -> bool:
+        """
+        The `filter` implementation for filters that inject a single attribute.
+
+        :param record: the log record to filter
+        :return: True, this filter does not exclude information from the log
+        """
+        attributes = record.__dict__
+        if self._attribute_name not in attributes:
+            attributes[self._attribute_name] = _LOG_CONTEXT.get().get(self._attribute_name)
+        return True
 
     def filter(self, record: logging.LogRecord) -> bool:
         """
@@ -27,8 +48,11 @@ class AsyncContextFilter(logging.Filter):
         :return: True, this filter does not exclude information from the log
         """
         context = _LOG_CONTEXT.get()
+        # Write straight into the record's attribute dict, which skips the attribute lookup machinery of setattr
+        attributes = record.__dict__
         for attribute_name in self.attribute_names:
-            setattr(record, attribute_name, context.get(attribute_name, None))
+            if attribute_name not in attributes:
+                attributes[attribute_name] = context.get(attribute_name)
         return True
 
     @staticmethod
@@ -45,6 +69,40 @@ class AsyncContextFilter(logging.Filter):
             _LOG_CONTEXT.set(context)
 
 
+class OrjsonFormatter(JsonFormatter):
+    """
+    A JsonFormatter that serializes log records with orjson instead of the standard library json module. Values orjson
+    cannot serialize natively are converted the same way the python-json-logger encoder converts them.
+    """
+
+    def jsonify_log_record(self, log_record: Dict[str, Any]) -> str:
+        """
+        Serialize the log record to a JSON string.
+
+        :param log_record: The fields of the log record to serialize.
+        :return: The JSON encoded log record.
+        """
+        try:
+            return orjson.dumps(
+                log_record, default=self.json_default or _orjson_default, option=orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        except TypeError:
+            # Fall back to the standard library encoder for anything orjson rejects so the record is never dropped
+            return super().jsonify_log_record(log_record)
+
+
+def _orjson_default(obj: Any) -> Any:
+    """
+    Convert an object orjson cannot serialize natively into a JSON compatible value.
+
+    :param obj: The object to convert.
+    :return: The formatted traceback for tracebacks, otherwise the string form of the object.
+    """
+    if isinstance(obj, TracebackType):
+        return "".join(traceback.format_tb(obj)).strip()
+    return str(obj)
+
+
 def configure_logger(
     logger: logging.Logger, log_level: int, log_formatter: logging.Formatter = None, log_filter: logging.Filter = None
 ) -> logging.Logger:
@@ -98,7 +156,20 @@ def get_logger(name: str = __name__, level: int = logging.INFO) -> logging.Logge
     return lambda_logger
 
 
-formatter = JsonFormatter(fmt="%(asctime)s %(name)s %(levelname)s %(item_id)s %(message)s", datefmt="%Y-%m-%dT%H:%M:%S")
+def logger_adapter_for(context: dict, base_logger: Optional[logging.Logger] = None) -> logging.LoggerAdapter:
+    """
+    Build a LoggerAdapter that attaches the given context to each record it emits. The context is only applied when
+    a record is actually created, and it is bound to the adapter rather than to shared module state.
+
+    :param context: The contextual attributes to add to each log record, e.g. {"item_id": item_id}.
+    :param base_logger: The logger to wrap. Defaults to the module level application logger.
+
+    :returns: The logger adapter carrying the context.
+    """
+    return logging.LoggerAdapter(base_logger or logger, context)
+
+
+formatter = OrjsonFormatter(fmt="%(asctime)s %(name)s %(levelname)s %(item_id)s %(message)s", datefmt="%Y-%m-%dT%H:%M:%S")
 
 filter = AsyncContextFilter(attribute_names=["item_id"])
 
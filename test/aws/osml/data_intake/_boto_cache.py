@@ -0,0 +1,21 @@
+#  Copyright 2024 Amazon.com, Inc. or its affiliates.
+
+from typing import Any, Dict, Tuple
+
+import boto3
+
+_client_cache: Dict[Tuple[str, str], Any] = {}
+
+
+def get_client(service: str, region: str = "us-east-1") -> Any:
+    """
+    Get a boto3 client for the tests, creating it once per service and region. Clients created outside a moto mock
+    are still routed to it, because moto intercepts requests when they are sent rather than when clients are created.
+
+    :param service: The name of the AWS service.
+    :param region: The AWS region of the client.
+    :returns: The shared boto3 client.
+    """
+    if (service, region) not in _client_cache:
+        _client_cache[(service, region)] = boto3.client(service, region_name=region)
+    return _client_cache[(service, region)]
@@ -0,0 +1,19 @@
+#  Copyright 2024 Amazon.com, Inc. or its affiliates.
+
+from typing import Dict
+
+from moto.core import DEFAULT_ACCOUNT_ID
+from moto.s3.models import s3_backends
+
+
+def seed_bucket(bucket: str, objects: Dict[str, bytes]) -> None:
+    """
+    Put objects straight into an existing bucket of the moto S3 backend. This skips the request serialization and
+    signing of put_object calls, which makes up most of the cost of seeding many objects.
+
+    :param bucket: The name of the mocked bucket to seed.
+    :param objects: The body of each object, keyed by object key.
+    """
+    backend = s3_backends[DEFAULT_ACCOUNT_ID]["global"]
+    for key, body in objects.items():
+        backend.put_object(bucket, key, body)
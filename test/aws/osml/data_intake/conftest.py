@@ -0,0 +1,17 @@
+#  Copyright 2024 Amazon.com, Inc. or its affiliates.
+
+import os
+import sys
+
+# Make sure boto3 clients always use the in-process moto backend. These variables would send requests to a moto
+#  server or another endpoint instead, and they must be cleared before any client is created, so this runs when
+#  pytest loads this conftest rather than in a fixture.
+for variable in ["MOTO_SERVER_MODE", "MOTO_S3_DEFAULT_BUCKET_LOCATION", "AWS_ENDPOINT_URL"]:
+    os.environ.pop(variable, None)
+
+# Skip the instance metadata lookups boto3 makes when it cannot find a region or credentials in the environment
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ["AWS_EC2_METADATA_DISABLED"] = "true"
+
+# Let the tests import the helper modules next to this conftest, e.g. _boto_cache, whatever pytest import mode is used
+sys.path.insert(0, os.path.dirname(__file__))
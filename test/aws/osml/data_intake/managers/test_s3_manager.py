@@ -1,13 +1,21 @@
 # Copyright 2024 Amazon.com, Inc. or its affiliates.
 
+import shutil
+import tempfile
 import unittest
+from dataclasses import FrozenInstanceError
+from io import BytesIO
 from unittest.mock import patch
 
-import boto3
+from _boto_cache import get_client
+from _s3_seed import seed_bucket
 from boto3.exceptions import S3UploadFailedError
 from botocore.exceptions import ClientError
 from moto import mock_aws
 
+from aws.osml.data_intake.managers.s3_manager import S3Manager, S3Url
+from aws.osml.data_intake.utils import AsyncContextFilter, logger
+
 
 class TestS3Url(unittest.TestCase):
     """
@@ -22,8 +30,6 @@ class TestS3Url(unittest.TestCase):
 
         Asserts that the bucket name, key, and full URL are correctly extracted from an S3 URL.
         """
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         url = "s3://bucketname/example/object.txt"
         s3_url = S3Url(url)
         self.assertEqual(s3_url.bucket, "bucketname")
@@ -33,15 +39,20 @@ class TestS3Url(unittest.TestCase):
         self.assertEqual(s3_url.filename, "object.txt")
 
     def test_key_with_query_string(self):
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         url = "s3://my-bucket/path/to/object?param1=value1&param2=value2"
         s3_url = S3Url(url)
         expected_key = "path/to/object?param1=value1&param2=value2"
         self.assertEqual(s3_url.key, expected_key)
 
+    def test_immutable(self):
+        """
+        Test that the parsed components of an S3Url cannot be reassigned.
+        """
+        s3_url = S3Url("s3://bucketname/example/object.txt")
+        with self.assertRaises(FrozenInstanceError):
+            s3_url.bucket = "otherbucket"
+
 
-@mock_aws
 class TestS3Manager(unittest.TestCase):
     """
     A test suite for the S3Manager class in the AWS OSML data intake module.
@@ -49,16 +60,34 @@ class TestS3Manager(unittest.TestCase):
     Tests file uploading and downloading functionality using a mocked AWS S3 environment.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        """
+        Start a single moto mock for all the tests of the class, its backends are reset before each test.
+        """
+        cls.aws_mock = mock_aws()
+        cls.aws_mock.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stop the moto mock of the class.
+        """
+        cls.aws_mock.stop()
+
     def setUp(self):
         """
         Set up the test environment for S3Manager tests.
         """
-        from aws.osml.data_intake.managers.s3_manager import S3Manager
+        self.aws_mock.reset()
 
-        self.s3_client = boto3.resource("s3", region_name="us-east-1")
+        self.s3_client = get_client("s3")
         self.bucket_name = "output_bucket"
-        self.s3_client.meta.client.create_bucket(Bucket=self.bucket_name)
-        self.s3_manager = S3Manager(self.bucket_name)
+        self.s3_client.create_bucket(Bucket=self.bucket_name)
+        # Keep local files in a directory of this test so tests running in parallel do not share them
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir, ignore_errors=True)
+        self.s3_manager = S3Manager(self.bucket_name, self.s3_client, f"{self.tmp_dir}/images")
 
     def test_download_file(self):
         """
@@ -66,47 +95,103 @@ class TestS3Manager(unittest.TestCase):
 
         Ensures a file can be downloaded from S3 and is correctly placed in the local temporary directory.
         """
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         s3_url = S3Url("s3://output_bucket/test_download_file.txt")
-        self.s3_client.meta.client.put_object(Bucket=s3_url.bucket, Key=s3_url.key, Body=b"Hello world!")
+        self.s3_client.put_object(Bucket=s3_url.bucket, Key=s3_url.key, Body=b"Hello world!")
         file_path = self.s3_manager.download_file(s3_url)
 
         with open(file_path, "rb") as f:
             content = f.read()
         self.assertEqual(content, b"Hello world!")
 
+    def test_download_files(self):
+        """
+        Test the bulk download functionality of S3Manager.
+
+        Ensures many objects can be downloaded at once and each lands in the local temporary directory.
+        """
+        s3_urls = [S3Url(f"s3://output_bucket/test_download_files_{i}.txt") for i in range(50)]
+        seed_bucket(self.bucket_name, {s3_url.key: f"Hello {i}!".encode() for i, s3_url in enumerate(s3_urls)})
+
+        file_paths = self.s3_manager.download_files(s3_urls)
+
+        self.assertEqual(len(file_paths), 50)
+        for i, file_path in enumerate(file_paths):
+            with open(file_path, "rb") as f:
+                self.assertEqual(f.read(), f"Hello {i}!".encode())
+
     def test_upload_file(self):
         """
         Test the upload functionality of S3Manager.
 
         Ensures a file can be uploaded to S3 and verifies the uploaded content matches the local file.
         """
-        file_path = "/tmp/test_upload_file.txt"
+        file_path = f"{self.tmp_dir}/test_upload_file.txt"
         with open(file_path, "w") as f:
             f.write("Upload me!")
 
         self.s3_manager.upload_file(file_path, "text file")
-        response = self.s3_client.meta.client.get_object(Bucket=self.bucket_name, Key="test_upload_file.txt")
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key="test_upload_file.txt")
         data = response["Body"].read()
         self.assertEqual(data.decode(), "Upload me!")
 
+    def test_upload_fileobj(self):
+        """
+        Test uploading a file-like object with S3Manager.
+
+        Ensures in-memory content can be uploaded under the given file name without writing it to disk.
+        """
+        self.s3_manager.set_output_folder("test_id")
+        self.s3_manager.upload_file(BytesIO(b"Upload me!"), "text file", file_name="test_upload_fileobj.txt")
+        response = self.s3_client.get_object(Bucket=self.bucket_name, Key="test_id/test_upload_fileobj.txt")
+        self.assertEqual(response["Body"].read().decode(), "Upload me!")
+
+    def test_upload_files(self):
+        """
+        Test the bulk upload functionality of S3Manager.
+
+        Ensures several files can be uploaded at once with their own upload arguments.
+        """
+        files = []
+        for i in range(5):
+            file_path = f"{self.tmp_dir}/test_upload_files_{i}.txt"
+            with open(file_path, "w") as f:
+                f.write(f"Upload me {i}!")
+            files.append((file_path, "text file", {"ContentType": "text/plain"}))
+
+        self.s3_manager.upload_files(files)
+
+        for i in range(5):
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=f"test_upload_files_{i}.txt")
+            self.assertEqual(response["Body"].read().decode(), f"Upload me {i}!")
+            self.assertEqual(response["ContentType"], "text/plain")
+
+    def test_upload_files_log_context(self):
+        """
+        Test that the logs of bulk uploads are tagged with the log context of the caller.
+        """
+        file_path = f"{self.tmp_dir}/test_upload_files_log_context.txt"
+        with open(file_path, "w") as f:
+            f.write("Upload me!")
+
+        AsyncContextFilter.set_context({"item_id": "test-item"})
+        self.addCleanup(AsyncContextFilter.set_context, None)
+        with self.assertLogs(logger, level="INFO") as captured:
+            self.s3_manager.upload_files([(file_path, "text file", None)])
+
+        self.assertEqual([record.item_id for record in captured.records], ["test-item"])
+
     def test_download_file_client_error(self):
         """
         Test error handling in download_file for non-existent buckets.
 
         Verifies that a Exception is raised when attempting to download from a non-existent bucket.
         """
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         s3_url = S3Url("s3://nonexistent_bucket/test_download_file.txt")
         s3_path = self.s3_manager.download_file(s3_url)
         self.assertEqual(None, s3_path)
 
     @patch("logging.Logger.error")
     def test_download_file_404_error(self, mock_error):
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         with patch("boto3.s3.transfer.S3Transfer.download_file") as download_file:
             download_file.side_effect = ClientError({"Error": {"Code": "404"}}, "unexpected")
 
@@ -120,8 +205,6 @@ class TestS3Manager(unittest.TestCase):
 
     @patch("logging.Logger.error")
     def test_download_file_403_error(self, mock_error):
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         with patch("boto3.s3.transfer.S3Transfer.download_file") as download_file:
             download_file.side_effect = ClientError({"Error": {"Code": "403"}}, "unexpected")
 
@@ -135,8 +218,6 @@ class TestS3Manager(unittest.TestCase):
             )
 
     def test_download_file_exception_error(self):
-        from aws.osml.data_intake.managers.s3_manager import S3Url
-
         with patch("boto3.s3.transfer.S3Transfer.download_file") as download_file:
             download_file.side_effect = Exception("Unexpected")
 
@@ -149,13 +230,28 @@ class TestS3Manager(unittest.TestCase):
 
         Verifies that an S3UploadFailedError is raised when attempting to upload to a bucket with incorrect permissions.
         """
-        file_path = "/tmp/test_upload_file.txt"
+        file_path = f"{self.tmp_dir}/test_upload_file.txt"
         with open(file_path, "w") as f:
             f.write("Upload me!")
         self.s3_manager.output_bucket = "non-exist-bucket"
         with self.assertRaises(S3UploadFailedError):
             self.s3_manager.upload_file(file_path, "text file")
 
+    def test_upload_fileobj_client_error(self):
+        """
+        Test that uploading a file-like object to a missing bucket raises an S3UploadFailedError like a file path does.
+        """
+        self.s3_manager.output_bucket = "non-exist-bucket"
+        with self.assertRaises(S3UploadFailedError):
+            self.s3_manager.upload_file(BytesIO(b"Upload me!"), "text file", file_name="test_upload_fileobj.txt")
+
+    def test_upload_fileobj_without_file_name(self):
+        """
+        Test that uploading a file-like object without a file name raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            self.s3_manager.upload_file(BytesIO(b"Upload me!"), "text file")
+
 
 if __name__ == "__main__":
     unittest.main()
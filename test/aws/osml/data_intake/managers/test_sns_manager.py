@@ -1,33 +1,62 @@
 #  Copyright 2024 Amazon.com, Inc. or its affiliates.
 
 import unittest
+from unittest.mock import patch
 
-import boto3
+from _boto_cache import get_client
 from botocore.exceptions import ClientError
 from moto import mock_aws
 
+from aws.osml.data_intake.managers.sns_manager import (
+    MESSAGE_FORMAT_ATTRIBUTE,
+    MSGPACK_MESSAGE_FORMAT,
+    SNSManager,
+    decode_message,
+    encode_message,
+    get_sns_client,
+)
+from aws.osml.data_intake.utils import AsyncContextFilter, ServiceConfig, logger, logger_adapter_for
+
 
-@mock_aws
 class TestSNSManager(unittest.TestCase):
     """
     Test suite for the SNSManager class.
     """
 
+    @classmethod
+    def setUpClass(cls):
+        """
+        Start a single moto mock for all the tests of the class and create the SNS topic they share. Tests that need
+        a missing topic use a throwaway one, see `use_deleted_topic`.
+        """
+        cls.aws_mock = mock_aws()
+        cls.aws_mock.start()
+        cls.sns_client = get_client("sns")
+        cls.sns_topic_arn = cls.sns_client.create_topic(Name="MyTopic")["TopicArn"]
+
+    @classmethod
+    def tearDownClass(cls):
+        """
+        Stop the moto mock of the class.
+        """
+        cls.aws_mock.stop()
+
     def setUp(self):
         """
         Set up the test environment for SNSManager tests.
 
-        Creates an SNS topic and initializes the SNSManager instance with the topic ARN.
+        Initializes the SNSManager instance with the ARN of the shared topic.
         """
-        from aws.osml.data_intake.managers.sns_manager import (  # Adjust the import according to your file structure
-            SNSManager,
-        )
-
-        sns_client = boto3.client("sns", region_name="us-east-1")
-        response = sns_client.create_topic(Name="MyTopic")
-        self.sns_topic_arn = response["TopicArn"]
         self.sns_manager = SNSManager(self.sns_topic_arn)
-        self.sns_manager.sns_client = sns_client
+        self.sns_manager.sns_client = self.sns_client
+
+    def use_deleted_topic(self):
+        """
+        Point the SNSManager at a topic that no longer exists, leaving the shared topic in place.
+        """
+        topic_arn = self.sns_client.create_topic(Name="DeletedTopic")["TopicArn"]
+        self.sns_client.delete_topic(TopicArn=topic_arn)
+        self.sns_manager.output_topic = topic_arn
 
     def test_publish_message_success(self):
         """
@@ -47,13 +76,145 @@ class TestSNSManager(unittest.TestCase):
         Simulates a failure scenario by deleting the SNS topic before publishing
         and verifies that a ClientError is raised.
         """
-        self.sns_manager.sns_client.delete_topic(TopicArn=self.sns_topic_arn)
+        self.use_deleted_topic()
         message = "This message should fail."
         subject = "Test Subject"
 
         with self.assertRaises(ClientError):
             self.sns_manager.publish_message(message=message, subject=subject)
 
+    def test_encode_decode_message(self):
+        """
+        Test that messages round trip through encoding and decoding in both the JSON and msgpack formats.
+        """
+        payload = {"id": "test_id", "bbox": [-1.5, -1.5, 1.5, 1.5], "properties": {"description": "Test item"}}
+
+        message, attributes = encode_message(payload)
+        self.assertEqual(attributes, {})
+        self.assertEqual(decode_message(message), payload)
+
+        with patch.object(ServiceConfig, "message_format", "msgpack"):
+            message, attributes = encode_message(payload)
+        message_format = attributes[MESSAGE_FORMAT_ATTRIBUTE]["StringValue"]
+        self.assertEqual(message_format, MSGPACK_MESSAGE_FORMAT)
+        self.assertEqual(decode_message(message, message_format), payload)
+
+        # The attributes are accepted by SNS
+        self.sns_manager.publish_message(message=message, subject="Test Subject", attributes=attributes)
+
+    def test_get_sns_client(self):
+        """
+        Test that SNS clients are created once per region and shared by every manager.
+        """
+        self.assertIs(get_sns_client("us-east-1"), get_sns_client("us-east-1"))
+        self.assertIsNot(get_sns_client("us-east-1"), get_sns_client("us-west-2"))
+        self.assertIs(SNSManager(self.sns_topic_arn).sns_client, SNSManager(self.sns_topic_arn).sns_client)
+
+    def test_publish_message_async_success(self):
+        """
+        Test background message publishing.
+
+        Verifies that messages published in the background are all delivered by the time flush returns.
+        """
+        futures = [self.sns_manager.publish_message_async(f"This is test message {i}.", "Test Subject") for i in range(100)]
+
+        self.assertEqual(self.sns_manager.flush(), [])
+        self.assertTrue(all(future.done() for future in futures))
+
+    def test_publish_message_async_failure(self):
+        """
+        Test background message publishing failure.
+
+        Simulates a failure scenario by deleting the SNS topic before publishing and verifies that the ClientError is
+        held by the future and returned by flush.
+        """
+        self.use_deleted_topic()
+
+        future = self.sns_manager.publish_message_async("This message should fail.", "Test Subject")
+        errors = self.sns_manager.flush()
+
+        self.assertIsInstance(future.exception(), ClientError)
+        self.assertEqual(errors, [future.exception()])
+
+    def test_publish_message_async_log_context(self):
+        """
+        Test that background publishing logs keep the item ID of the caller, whether it comes from the logger given to
+        the manager or from the log context of the caller.
+        """
+        sns_manager = SNSManager(self.sns_topic_arn, logger_adapter_for({"item_id": "from-adapter"}))
+        sns_manager.sns_client = self.sns_client
+        with self.assertLogs(logger, level="INFO") as captured:
+            sns_manager.publish_message_async("This is a test message.", "Test Subject")
+            sns_manager.flush()
+
+            AsyncContextFilter.set_context({"item_id": "from-context"})
+            self.sns_manager.publish_message_async("This is a test message.", "Test Subject")
+            self.sns_manager.flush()
+            AsyncContextFilter.set_context(None)
+
+        self.assertEqual([record.item_id for record in captured.records], ["from-adapter", "from-context"])
+
+    def test_publish_messages_success(self):
+        """
+        Test successful batch message publishing.
+
+        Verifies that more messages than fit in a single PublishBatch request are all published without failures.
+        """
+        messages = [f"This is test message {i}." for i in range(25)]
+        with patch.object(
+            self.sns_manager.sns_client, "publish_batch", wraps=self.sns_manager.sns_client.publish_batch
+        ) as batch:
+            failed = self.sns_manager.publish_messages(messages=messages, subject="Test Subject")
+
+        self.assertEqual(failed, [])
+        self.assertEqual(batch.call_count, 3)
+
+    def test_publish_messages_delivered(self):
+        """
+        Test that every message of a batch publish is delivered to the topic subscribers.
+
+        Subscribes an SQS queue to the topic, publishes more msgpack encoded messages than fit in one PublishBatch
+        request and verifies the queue received all of them with their format attribute.
+        """
+        sqs_client = get_client("sqs")
+        queue_url = sqs_client.create_queue(QueueName="MyQueue")["QueueUrl"]
+        queue_arn = sqs_client.get_queue_attributes(QueueUrl=queue_url, AttributeNames=["QueueArn"])["Attributes"][
+            "QueueArn"
+        ]
+        subscription_arn = self.sns_client.subscribe(
+            TopicArn=self.sns_topic_arn, Protocol="sqs", Endpoint=queue_arn, Attributes={"RawMessageDelivery": "true"}
+        )["SubscriptionArn"]
+        self.addCleanup(self.sns_client.unsubscribe, SubscriptionArn=subscription_arn)
+
+        payloads = [{"id": str(i)} for i in range(25)]
+        with patch.object(ServiceConfig, "message_format", "msgpack"):
+            messages, attributes = zip(*[encode_message(payload) for payload in payloads])
+        failed = self.sns_manager.publish_messages(
+            messages=list(messages), subject="Test Subject", attributes=list(attributes)
+        )
+
+        received = []
+        while True:
+            response = sqs_client.receive_message(QueueUrl=queue_url, MaxNumberOfMessages=10, MessageAttributeNames=["All"])
+            if not response.get("Messages"):
+                break
+            for message in response["Messages"]:
+                message_format = message["MessageAttributes"][MESSAGE_FORMAT_ATTRIBUTE]["StringValue"]
+                received.append(decode_message(message["Body"], message_format))
+        self.assertEqual(failed, [])
+        self.assertCountEqual(received, payloads)
+
+    def test_publish_messages_failure(self):
+        """
+        Test batch message publishing failure.
+
+        Simulates a failure scenario by deleting the SNS topic before publishing and verifies that a ClientError is raised.
+        """
+        self.use_deleted_topic()
+
+        with self.assertRaises(ClientError):
+            self.sns_manager.publish_messages(messages=["This message should fail."], subject="Test Subject")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,19 +9,20 @@ import boto3
 import pytest
 from moto import mock_aws
 
+from aws.osml.data_intake.bulk_processor import BulkProcessor, process_manifest_file
+from aws.osml.data_intake.managers import S3Url
+
 
 @mock_aws
 class TestBulkProcessor(unittest.TestCase):
     def setUp(self):
-        from aws.osml.data_intake.bulk_processor import BulkProcessor
-
         self.test_bucket = "test-bucket"
         self.failed_manifest_file = "./test/data/failed_images_manifest.json"
         self.test_image = f"s3://{self.test_bucket}/small.tif"
-        self.aws_s3 = boto3.resource("s3", region_name="us-east-1")
-        self.aws_s3.meta.client.create_bucket(Bucket=self.test_bucket)
-        self.aws_s3.meta.client.upload_file("./test/data/small.tif", self.test_bucket, "small.tif")
-        self.aws_s3.meta.client.upload_file("./test/data/manifest.json", self.test_bucket, "manifest.json")
+        self.aws_s3 = boto3.client("s3", region_name="us-east-1")
+        self.aws_s3.create_bucket(Bucket=self.test_bucket)
+        self.aws_s3.upload_file("./test/data/small.tif", self.test_bucket, "small.tif")
+        self.aws_s3.upload_file("./test/data/manifest.json", self.test_bucket, "manifest.json")
 
         self.s3_uri = os.environ["S3_URI"]
         self.input_path = os.environ["S3_INPUT_PATH"]
@@ -50,16 +51,12 @@ class TestBulkProcessor(unittest.TestCase):
         ]
 
     def test_process_manifest_file(self):
-        from aws.osml.data_intake.bulk_processor import process_manifest_file
-
         lst = process_manifest_file(self.aws_s3, self.input_path, self.s3_uri)
 
         assert len(lst) == 1
         assert lst[0] == self.test_image
 
     def test_generate_upload_files(self):
-        from aws.osml.data_intake.managers import S3Url
-
         mock_item_id = "mock_id"
 
         image_data, s3_manager = self.bulk_processor.generate_upload_files(self.test_image, mock_item_id)
@@ -8,6 +8,8 @@ import unittest
 import boto3
 from moto import mock_aws
 
+from aws.osml.data_intake.image_processor import ImageData, ImageProcessor
+
 
 @mock_aws
 class TestImageProcessor(unittest.TestCase):
@@ -26,16 +28,14 @@ class TestImageProcessor(unittest.TestCase):
         creating an SNS topic, and initializing the ImageProcessor with
         a mock S3 image URL and mock AWS clients.
         """
-        from aws.osml.data_intake.image_processor import ImageProcessor
-
         # Retrieve environment variables or set default values
         test_bucket = "test-bucket"
         test_topic = "test-topic"
 
         # Create S3 bucket and upload test image
-        s3 = boto3.resource("s3", region_name="us-east-1")
-        s3.meta.client.create_bucket(Bucket=test_bucket)
-        s3.meta.client.upload_file("./test/data/small.tif", test_bucket, "small.tif")
+        s3 = boto3.client("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=test_bucket)
+        s3.upload_file("./test/data/small.tif", test_bucket, "small.tif")
 
         # Create an SNS topic
         sns = boto3.client("sns", region_name="us-east-1")
@@ -88,8 +88,6 @@ class TestImageData(unittest.TestCase):
         """
         Set up the test environment for testing ImageData.
         """
-        from aws.osml.data_intake.image_processor import ImageData
-
         self.original_source = "./test/data/small.tif"
         self.source_file = "./test/data/small-test.tif"
         shutil.copyfile(self.original_source, self.source_file)
@@ -1,14 +1,27 @@
 #  Copyright 2024 Amazon.com, Inc. or its affiliates.
 
 import asyncio
+import base64
 import json
+import os
 import unittest
-from unittest.mock import AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import boto3
 from moto import mock_aws
+from opensearchpy import AWSV4SignerAsyncAuth
 from stac_fastapi.types.stac import Item
 
+from aws.osml.data_intake.ingest_processor import (
+    IngestProcessor,
+    create_search_client,
+    handler,
+    search_client_config,
+    unwrap_sqs_record,
+)
+from aws.osml.data_intake.managers import MESSAGE_FORMAT_ATTRIBUTE, encode_message
+from aws.osml.data_intake.utils import ServiceConfig, get_minimal_collection_dict
+
 mock_message = json.dumps(
     {
         "id": "123",
@@ -54,16 +67,13 @@ class TestIngestProcessor(unittest.TestCase):
     @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.check_collection_exists", new_callable=AsyncMock)
     @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.prep_create_item", new_callable=AsyncMock)
     @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.create_item", new_callable=AsyncMock)
-    def test_handler_success(self, mock_create_item, mock_check_collection, mock_prep_item):
+    def test_handler_success(self, mock_create_item, mock_prep_item, mock_check_collection):
         """
         Test the handler function for a successful scenario.
         """
-        from aws.osml.data_intake.ingest_processor import handler
-
         mock_check_collection.return_value = asyncio.Future()
         mock_check_collection.return_value.set_result(None)  # Simulate success
-        mock_prep_item.return_value = asyncio.Future()
-        mock_prep_item.return_value.set_result(Item(**json.loads(mock_message)))  # Simulate success
+        mock_prep_item.return_value = Item(**json.loads(mock_message))  # Simulate success
         mock_create_item.return_value = asyncio.Future()
         mock_create_item.return_value.set_result(None)  # Simulate success
 
@@ -76,16 +86,13 @@ class TestIngestProcessor(unittest.TestCase):
     @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.check_collection_exists", new_callable=AsyncMock)
     @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.prep_create_item", new_callable=AsyncMock)
     @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.create_item", new_callable=AsyncMock)
-    def test_handler_failure(self, mock_create_item, mock_check_collection, mock_prep_item):
+    def test_handler_failure(self, mock_create_item, mock_prep_item, mock_check_collection):
         """
         Test the handler function for a unsuccessful scenario.
         """
-        from aws.osml.data_intake.ingest_processor import handler
-
         mock_check_collection.return_value = asyncio.Future()
         mock_check_collection.return_value.set_result(None)  # Simulate success
-        mock_prep_item.return_value = asyncio.Future()
-        mock_prep_item.return_value.set_result(Item(**json.loads(mock_message)))  # Simulate success
+        mock_prep_item.return_value = Item(**json.loads(mock_message))  # Simulate success
 
         mock_create_item.side_effect = Exception("Database error")
 
@@ -95,6 +102,177 @@ class TestIngestProcessor(unittest.TestCase):
         self.assertEqual(response["statusCode"], 500)
         self.assertIn("Database error", json.loads(response["body"])["message"])
 
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.check_collection_exists", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.prep_create_item", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.create_item", new_callable=AsyncMock)
+    def test_process_post_processing(self, mock_create_item, mock_prep_item, mock_check_collection):
+        """
+        Test that items whose data asset title is in the post-processing allowlist are published for post-processing
+        as prepared for the database.
+        """
+        stac_item = json.loads(mock_message)
+        stac_item["assets"] = {"data": {"href": "s3://test-bucket/small.tif", "title": "Source Image"}}
+        prepped_item = {**stac_item, "properties": {"created": "2024-01-01T00:00:00Z", "updated": "2024-01-01T00:00:00Z"}}
+        mock_prep_item.return_value = prepped_item
+        processor = IngestProcessor(json.dumps(stac_item))
+        processor.sns_manager = MagicMock()
+
+        with patch.object(ServiceConfig, "post_processing_asset_data_titles", frozenset(["Source Image"])):
+            response = asyncio.get_event_loop().run_until_complete(processor.process())
+
+        self.assertEqual(response["statusCode"], 200)
+        processor.sns_manager.publish_message_async.assert_called_once()
+        published = processor.sns_manager.publish_message_async.call_args.kwargs
+        self.assertEqual(json.loads(published["message"]), prepped_item)
+        self.assertEqual(published["subject"], "Source Image")
+
+    @patch("aws.osml.data_intake.ingest_processor.helpers.async_bulk", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.check_collection_exists", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.prep_create_item", new_callable=AsyncMock)
+    def test_handler_sqs_batch(self, mock_prep_item, mock_check_collection, mock_async_bulk):
+        """
+        Test the handler function for a batch of SQS records, reporting only the records that failed.
+        """
+        mock_prep_item.side_effect = lambda item, base_url, exist_ok: item
+        mock_async_bulk.return_value = (1, [{"index": {"_id": "2|test-collection", "status": 500}}])
+
+        items = [{**json.loads(mock_message), "id": item_id} for item_id in ["1", "2"]]
+        event = {
+            "Records": [
+                # SNS notification envelope
+                {"messageId": "a", "body": json.dumps({"Type": "Notification", "Message": json.dumps(items[0])})},
+                # Raw message delivery
+                {"messageId": "b", "body": json.dumps(items[1])},
+                # Item without a collection
+                {"messageId": "c", "body": json.dumps({"id": "3"})},
+            ]
+        }
+        response = handler(event, None)
+
+        self.assertEqual(response, {"batchItemFailures": [{"itemIdentifier": "c"}, {"itemIdentifier": "b"}]})
+        mock_async_bulk.assert_called_once()
+        self.assertEqual(
+            [action["_id"] for action in mock_async_bulk.call_args.args[1]], ["1|test-collection", "2|test-collection"]
+        )
+
+    @patch("aws.osml.data_intake.ingest_processor.helpers.async_bulk", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.check_collection_exists", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.prep_create_item", new_callable=AsyncMock)
+    def test_handler_sqs_batch_redelivery(self, mock_prep_item, mock_check_collection, mock_async_bulk):
+        """
+        Test that redelivered and duplicate records are indexed once and not retried when only publishing fails.
+        """
+        mock_prep_item.side_effect = lambda item, base_url, exist_ok: item
+        mock_async_bulk.return_value = (1, [])
+
+        stac_item = json.loads(mock_message)
+        stac_item["assets"] = {"data": {"href": "s3://test-bucket/small.tif", "title": "Source Image"}}
+        event = {"Records": [{"messageId": record_id, "body": json.dumps(stac_item)} for record_id in ["a", "b"]]}
+        with (
+            patch.object(ServiceConfig, "stac_post_processing_topic", "test-topic"),
+            patch.object(ServiceConfig, "post_processing_asset_data_titles", frozenset(["Source Image"])),
+            patch("aws.osml.data_intake.ingest_processor.SNSManager") as mock_sns_manager,
+        ):
+            mock_sns_manager.return_value.publish_messages.return_value = [{"Id": "0", "Message": "SNS error"}]
+            response = handler(event, None)
+
+        self.assertEqual(response, {"batchItemFailures": []})
+        self.assertTrue(all(call.kwargs["exist_ok"] for call in mock_prep_item.call_args_list))
+        self.assertEqual([action["_id"] for action in mock_async_bulk.call_args.args[1]], ["123|test-collection"])
+        mock_sns_manager.return_value.publish_messages.assert_called_once()
+        messages, subject = mock_sns_manager.return_value.publish_messages.call_args.args
+        self.assertEqual([json.loads(message) for message in messages], [stac_item])
+        self.assertEqual(subject, "Source Image")
+
+        # A failed insert fails every record carrying the item
+        mock_async_bulk.return_value = (0, [{"index": {"_id": "123|test-collection", "status": 500}}])
+        response = handler(event, None)
+        self.assertEqual(response, {"batchItemFailures": [{"itemIdentifier": "a"}, {"itemIdentifier": "b"}]})
+
+    @patch("aws.osml.data_intake.ingest_processor.helpers.async_bulk", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.check_collection_exists", new_callable=AsyncMock)
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.prep_create_item", new_callable=AsyncMock)
+    def test_handler_kinesis_batch(self, mock_prep_item, mock_check_collection, mock_async_bulk):
+        """
+        Test the handler function for a batch of Kinesis records, reporting failed records by sequence number.
+        """
+        mock_prep_item.side_effect = lambda item, base_url, exist_ok: item
+        mock_async_bulk.return_value = (2, [])
+
+        items = [{**json.loads(mock_message), "id": item_id} for item_id in ["1", "2"]]
+        with patch.object(ServiceConfig, "message_format", "msgpack"):
+            msgpack_message, _ = encode_message(items[1])
+        payloads = [
+            base64.b64encode(json.dumps(items[0]).encode()).decode(),
+            msgpack_message,
+            base64.b64encode(b"{").decode(),
+        ]
+        event = {
+            "Records": [
+                {"kinesis": {"sequenceNumber": str(index), "data": payload}} for index, payload in enumerate(payloads)
+            ]
+        }
+        response = handler(event, None)
+
+        self.assertEqual(response, {"batchItemFailures": [{"itemIdentifier": "2"}]})
+        self.assertEqual(
+            [action["_id"] for action in mock_async_bulk.call_args.args[1]], ["1|test-collection", "2|test-collection"]
+        )
+
+    def test_unwrap_sqs_record_msgpack(self):
+        """
+        Test that msgpack encoded messages are unwrapped with their format, whether or not SNS wrapped them in an envelope.
+        """
+        stac_item = json.loads(mock_message)
+        with patch.object(ServiceConfig, "message_format", "msgpack"):
+            message, attributes = encode_message(stac_item)
+        attribute = attributes[MESSAGE_FORMAT_ATTRIBUTE]
+
+        envelope = {
+            "Type": "Notification",
+            "Message": message,
+            "MessageAttributes": {MESSAGE_FORMAT_ATTRIBUTE: {"Type": "String", "Value": attribute["StringValue"]}},
+        }
+        raw_record = {
+            "body": message,
+            "messageAttributes": {MESSAGE_FORMAT_ATTRIBUTE: {"dataType": "String", "stringValue": attribute["StringValue"]}},
+        }
+        for record in [{"body": json.dumps(envelope)}, raw_record]:
+            processor = IngestProcessor(*unwrap_sqs_record(record))
+            self.assertEqual(processor.stac_item, stac_item)
+
+    def test_search_client_config(self):
+        """
+        Test that the OpenSearch connection settings are still read from the stac_fastapi ES_* environment variables.
+        """
+        environment = {"ES_HOST": "search.example.com", "ES_PORT": "9200", "ES_USE_SSL": "false"}
+        with patch.dict(os.environ, environment):
+            config = search_client_config()
+
+        self.assertEqual(config["hosts"], ["http://search.example.com:9200"])
+
+    def test_create_search_client(self):
+        """
+        Test that the shared search client is built with a sized connection pool and, when enabled, SigV4 signing.
+        """
+        with patch.object(ServiceConfig, "opensearch_sigv4", True):
+            client = create_search_client()
+
+        self.assertEqual(client.transport.kwargs["maxsize"], ServiceConfig.opensearch_max_connections)
+        self.assertIsInstance(client.transport.kwargs["http_auth"], AWSV4SignerAsyncAuth)
+
+    @patch("stac_fastapi.opensearch.database_logic.DatabaseLogic.create_collection", new_callable=AsyncMock)
+    def test_create_minimal_collection(self, mock_create_collection):
+        """
+        Test that minimal collections are created with the minimal collection definition.
+        """
+        processor = IngestProcessor(mock_message)
+        asyncio.get_event_loop().run_until_complete(processor.create_minimal_collection("collection-a"))
+        asyncio.get_event_loop().run_until_complete(processor.create_minimal_collection("collection-b"))
+
+        self.assertEqual(mock_create_collection.call_args_list[0].args[0], get_minimal_collection_dict("collection-a"))
+        self.assertEqual(mock_create_collection.call_args_list[1].args[0], get_minimal_collection_dict("collection-b"))
+
 
 if __name__ == "__main__":
     unittest.main()
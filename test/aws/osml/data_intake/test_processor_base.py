@@ -3,11 +3,12 @@
 import json
 import unittest
 
+from aws.osml.data_intake.processor_base import ProcessorBase
+from aws.osml.data_intake.utils import logger, logger_adapter_for
+
 
 class TestProcessorBase(unittest.TestCase):
     def test_success_message(self):
-        from aws.osml.data_intake.processor_base import ProcessorBase
-
         message = "Processing completed successfully."
         expected_result = {"statusCode": 200, "body": json.dumps(message)}
 
@@ -16,8 +17,6 @@ class TestProcessorBase(unittest.TestCase):
         self.assertEqual(result, expected_result)
 
     def test_failure_message(self):
-        from aws.osml.data_intake.processor_base import ProcessorBase
-
         exception_message = "An error occurred during processing."
         mock_exception = Exception(exception_message)
 
@@ -27,10 +26,34 @@ class TestProcessorBase(unittest.TestCase):
 
         self.assertEqual(result["statusCode"], 500)
         self.assertIn("message", result_body)
-        self.assertIn("stack_trace", result_body)
+        self.assertIn("type", result_body)
         self.assertEqual(result_body["message"], exception_message)
-        self.assertIsInstance(result_body["stack_trace"], list)
-        self.assertGreater(len(result_body["stack_trace"]), 0)
+        self.assertEqual(result_body["type"], "Exception")
+        self.assertNotIn("stack_trace", result_body)
+
+    def test_failure_payload(self):
+        exception_message = "An error occurred during processing."
+
+        payload = ProcessorBase.failure_payload(ValueError(exception_message))
+
+        self.assertEqual(payload, {"message": exception_message, "type": "ValueError"})
+
+    def test_failure_message_logs_stack_trace(self):
+        try:
+            raise ValueError("An error occurred during processing.")
+        except ValueError as error:
+            with self.assertLogs(logger, level="ERROR") as captured:
+                ProcessorBase.failure_message(error)
+
+        self.assertIn("Traceback (most recent call last)", captured.output[0])
+        self.assertIn("ValueError: An error occurred during processing.", captured.output[0])
+
+    def test_failure_message_logs_to_given_logger(self):
+        adapter = logger_adapter_for({"item_id": "123"})
+        with self.assertLogs(logger, level="ERROR") as captured:
+            ProcessorBase.failure_message(ValueError("An error occurred during processing."), adapter)
+
+        self.assertEqual(captured.records[0].item_id, "123")
 
 
 if __name__ == "__main__":
@@ -2,11 +2,11 @@
 
 import unittest
 
+from aws.osml.data_intake.utils.app_config import get_minimal_collection_dict
+
 
 class TestLambdaLogger(unittest.TestCase):
     def test_minimal_collection(self):
-        from aws.osml.data_intake.utils.app_config import get_minimal_collection_dict
-
         mock_collection_id = "test-collection"
         expected_minimal_collection = {
             "type": "Collection",
@@ -21,3 +21,13 @@ class TestLambdaLogger(unittest.TestCase):
         collection_dict = get_minimal_collection_dict(mock_collection_id)
 
         assert collection_dict == expected_minimal_collection
+
+    def test_minimal_collection_independent(self):
+        collection_dict = get_minimal_collection_dict("collection-a")
+        collection_dict["links"].append({"href": "https://example.com", "rel": "root"})
+        collection_dict["extent"]["temporal"]["interval"].append(["2024-01-01T00:00:00Z", None])
+
+        other_collection_dict = get_minimal_collection_dict("collection-b")
+
+        assert other_collection_dict["links"] == [{"href": "", "rel": "self"}]
+        assert other_collection_dict["extent"]["temporal"]["interval"] == []
@@ -1,39 +1,57 @@
 #  Copyright 2024 Amazon.com, Inc. or its affiliates.
 
+import json
 import logging
 import unittest
-from unittest.mock import patch
+
+from aws.osml.data_intake.utils.logger import (
+    _LOG_CONTEXT,
+    AsyncContextFilter,
+    OrjsonFormatter,
+    configure_logger,
+    get_logger,
+    logger_adapter_for,
+)
 
 
 class TestLambdaLogger(unittest.TestCase):
-    @patch("logging.Logger.hasHandlers", return_value=False)
-    @patch("logging.basicConfig")
-    def test_logger_no_handlers(self, mock_basic_config, mock_has_handlers):
+    def use_root_handlers(self, handlers):
+        """
+        Give the root logger the given handlers for the duration of the test, restoring its handlers and level after.
+        """
+        root_logger = logging.getLogger()
+        self.addCleanup(setattr, root_logger, "handlers", root_logger.handlers)
+        self.addCleanup(root_logger.setLevel, root_logger.level)
+        root_logger.handlers = handlers
+        return root_logger
+
+    def test_logger_no_handlers(self):
         """
         Test that basicConfig is called if no handlers are present on the root logger.
         """
-        from aws.osml.data_intake.utils.logger import get_logger
+        root_logger = self.use_root_handlers([])
 
         logger = get_logger("test_logger", logging.DEBUG)
 
-        # Check that basicConfig was called correctly
-        mock_basic_config.assert_called_once_with(level=logging.DEBUG)
+        # Check that basicConfig configured the root logger
+        self.assertEqual(len(root_logger.handlers), 1)
+        self.assertEqual(root_logger.level, logging.DEBUG)
 
         # Check that the logger returned has the correct name
         self.assertEqual(logger.name, "test_logger")
 
-    @patch("logging.Logger.hasHandlers", return_value=True)
-    @patch("logging.basicConfig")
-    def test_logger_with_handlers(self, mock_basic_config, mock_has_handlers):
+    def test_logger_with_handlers(self):
         """
-        Test that basicConfig is called if handlers are present on the root logger.
+        Test that basicConfig is not called if handlers are present on the root logger.
         """
-        from aws.osml.data_intake.utils.logger import get_logger
+        handler = logging.NullHandler()
+        root_logger = self.use_root_handlers([handler])
 
         logger = get_logger("test_logger", logging.DEBUG)
 
-        # Check that basicConfig was not called
-        mock_basic_config.assert_not_called()
+        # Check that basicConfig did not add a handler, only the level was set
+        self.assertEqual(root_logger.handlers, [handler])
+        self.assertEqual(root_logger.level, logging.DEBUG)
 
         # Check that the logger returned has the correct name
         self.assertEqual(logger.name, "test_logger")
@@ -42,13 +60,9 @@ class TestLambdaLogger(unittest.TestCase):
         """
         Test the configure_logger function.
         """
-        from pythonjsonlogger.jsonlogger import JsonFormatter
-
-        from aws.osml.data_intake.utils.logger import AsyncContextFilter, configure_logger
-
         logger = logging.getLogger("test_configure_logger")
 
-        formatter = JsonFormatter(
+        formatter = OrjsonFormatter(
             fmt="%(asctime)s %(name)s %(levelname)s %(image_hash)s %(message)s", datefmt="%Y-%m-%dT%H:%M:%S"
         )
         filter = AsyncContextFilter(attribute_names=["image_hash"])
@@ -69,12 +83,45 @@ class TestLambdaLogger(unittest.TestCase):
 
         self.assertFalse(configured_logger.propagate)
 
+    def test_orjson_formatter(self):
+        """
+        Test that the OrjsonFormatter emits the configured fields as JSON, including values orjson cannot encode.
+        """
+        formatter = OrjsonFormatter(fmt="%(levelname)s %(item_id)s %(message)s")
+        record = logging.LogRecord(
+            name="test", level=logging.INFO, pathname=__file__, lineno=0, msg="Test %s", args=("message",), exc_info=None
+        )
+        record.item_id = "item-1"
+        record.error = ValueError("Test error")
+
+        formatted = json.loads(formatter.format(record))
+
+        self.assertEqual(formatted["levelname"], "INFO")
+        self.assertEqual(formatted["item_id"], "item-1")
+        self.assertEqual(formatted["message"], "Test message")
+        self.assertEqual(formatted["error"], "Test error")
+
+    def test_orjson_formatter_fallback(self):
+        """
+        Test that the OrjsonFormatter encodes non-string keys and falls back to the standard encoder for values orjson
+        rejects, e.g. integers wider than 64 bits.
+        """
+        formatter = OrjsonFormatter(fmt="%(message)s")
+        record = logging.LogRecord(
+            name="test", level=logging.INFO, pathname=__file__, lineno=0, msg="Test message", args=(), exc_info=None
+        )
+        record.counts = {1: 2}
+        record.total = 2**70
+
+        formatted = json.loads(formatter.format(record))
+
+        self.assertEqual(formatted["counts"], {"1": 2})
+        self.assertEqual(formatted["total"], 2**70)
+
     def test_async_context_filter(self):
         """
         Test the AsyncContextFilter class.
         """
-        from aws.osml.data_intake.utils.logger import _LOG_CONTEXT, AsyncContextFilter
-
         filter = AsyncContextFilter(attribute_names=["image_hash"])
 
         record = logging.LogRecord(
@@ -87,15 +134,49 @@ class TestLambdaLogger(unittest.TestCase):
 
         # Test without context
         _LOG_CONTEXT.set({})
+        record = logging.LogRecord(
+            name="test", level=logging.INFO, pathname=__file__, lineno=0, msg="Test message", args=(), exc_info=None
+        )
         self.assertTrue(filter.filter(record))
         self.assertIsNone(record.image_hash)
 
+        # Test with several attributes, one of them already on the record
+        attribute_names = ["image_hash", "item_id"]
+        filter = AsyncContextFilter(attribute_names=attribute_names)
+        attribute_names.append("job_id")
+        _LOG_CONTEXT.set({"image_hash": "123456", "item_id": "from-context"})
+        record = logging.LogRecord(
+            name="test", level=logging.INFO, pathname=__file__, lineno=0, msg="Test message", args=(), exc_info=None
+        )
+        record.item_id = "from-record"
+        self.assertTrue(filter.filter(record))
+        self.assertEqual(record.image_hash, "123456")
+        self.assertEqual(record.item_id, "from-record")
+        self.assertFalse(hasattr(record, "job_id"))
+        _LOG_CONTEXT.set({})
+
+    def test_logger_adapter_for(self):
+        """
+        Test that the context bound to a logger adapter is added to its records and not overridden by the filter.
+        """
+        logger = logging.getLogger("test_logger_adapter_for")
+        filter = AsyncContextFilter(attribute_names=["item_id"])
+        logger.addFilter(filter)
+        _LOG_CONTEXT.set({"item_id": "from-context"})
+
+        adapter = logger_adapter_for({"item_id": "from-adapter"}, logger)
+        with self.assertLogs(logger, level=logging.INFO) as captured:
+            adapter.info("Test message")
+            logger.info("Test message")
+
+        self.assertEqual(captured.records[0].item_id, "from-adapter")
+        self.assertEqual(captured.records[1].item_id, "from-context")
+        _LOG_CONTEXT.set({})
+
     def test_set_context(self):
         """
         Test the set_context static method of AsyncContextFilter.
         """
-        from aws.osml.data_intake.utils.logger import _LOG_CONTEXT, AsyncContextFilter
-
         context = {"key": "value"}
         AsyncContextFilter.set_context(context)
         self.assertEqual(_LOG_CONTEXT.get(), context)